@@ -1,9 +1,19 @@
+import hashlib
 import io
-import math
+import logging
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import TimeoutError as HTTPTimeoutError
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 from PIL import Image, ImageDraw, ImageFont
 import streamlit as st
@@ -89,7 +99,6 @@ GLOBAL_CSS = """
 }
 </style>
 """
-st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
 
 # st.html 헬퍼: 없으면 markdown 폴백
 def render_html(html: str):
@@ -98,9 +107,37 @@ def render_html(html: str):
     except AttributeError:
         st.markdown(html, unsafe_allow_html=True)
 
+# CSS는 재실행마다 다시 내보내야 유지됨 → 마크다운 파서를 거치지 않는 st.html 경로로 전달
+render_html(GLOBAL_CSS)
+
 # -----------------------------
 # 유틸 함수
 # -----------------------------
+_log = logging.getLogger(__name__)
+
+# 이미지 다운로드 동시 작업 수 / 호스트별 keep-alive 연결 수
+_FETCH_WORKERS = 16
+_HTTP_POOL_SIZE = 32
+# 이미지 다운로드 타임아웃(초): 죽은 호스트는 연결 단계에서 빨리 포기, 느린 전송은 읽기 한도까지 대기
+# (연결/읽기 실패는 재시도하지 않으므로 이 값이 그대로 최대 대기 시간)
+CONNECT_TIMEOUT = 2.0
+READ_TIMEOUT = 4.0
+
+@st.cache_resource(show_spinner=False)
+def _http_session() -> requests.Session:
+    """
+    이미지 다운로드용 공용 세션. 스크립트 재실행 사이에도 유지되어 TCP/TLS 연결을 재사용
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_HTTP_POOL_SIZE,
+        pool_maxsize=_HTTP_POOL_SIZE,
+        max_retries=Retry(total=2, connect=0, read=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 def format_won(x: float) -> str:
     try:
         n = int(round(float(x)))
@@ -108,23 +145,54 @@ def format_won(x: float) -> str:
         n = 0
     return f"{n:,}원"
 
-def _parse_price(v):
-    if pd.isna(v):
-        return 0
-    if isinstance(v, (int, float)):
-        return int(v)
-    s = str(v).replace(",", "").replace("원", "").strip()
+# 이미 정수로 확정된 금액용 (format_won의 float/round/예외 처리 생략, Series.map에도 그대로 사용)
+_format_won_int = "{:,}원".format
+
+_PRICE_STRIP_RE = re.compile(r"[,원\s]")
+
+def _parse_prices(prices: pd.Series) -> pd.Series:
+    """
+    '1,200원' 같은 가격 문자열 열을 한 번에 정수로 변환 (해석 불가 값은 0)
+    """
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.fillna(0).astype(int)
+    # 이미 숫자로 읽히는 칸은 그대로 쓰고, 나머지 칸만 정규식으로 정리
+    # (Arrow 문자열 열도 같은 경로를 타도록 object로 맞춤)
+    prices = prices.astype(object)
+    numeric = pd.to_numeric(prices, errors="coerce")
+    todo = numeric.isna() & prices.notna()
+    if todo.any():
+        cleaned = prices[todo].astype(str).str.replace(_PRICE_STRIP_RE, "", regex=True)
+        numeric = numeric.where(~todo, pd.to_numeric(cleaned, errors="coerce"))
+    return numeric.fillna(0).astype(int)
+
+def _read_csv_fast(csv_path: str, usecols=None, dtype=None) -> pd.DataFrame:
+    """
+    pyarrow 엔진(멀티스레드, Arrow 문자열)으로 읽고, 없거나 실패하면 기본 C 엔진(mmap)으로 폴백
+    """
     try:
-        return int(float(s))
-    except Exception:
-        return 0
+        return pd.read_csv(csv_path, usecols=usecols, dtype=dtype, engine="pyarrow", dtype_backend="pyarrow")
+    except (ImportError, ValueError, TypeError):
+        return pd.read_csv(csv_path, usecols=usecols, dtype=dtype, memory_map=True)
 
-@st.cache_data
+def _string_dtype() -> pd.StringDtype:
+    """
+    Arrow 저장소 문자열 dtype (pyarrow가 없으면 기본 문자열 dtype)
+    """
+    try:
+        return pd.StringDtype("pyarrow")
+    except ImportError:
+        return pd.StringDtype()
+
+# 카탈로그는 앱에서 수정하지 않으므로 cache_resource로 같은 DataFrame을 공유
+# (cache_data처럼 호출마다 pickle 복사본을 만들지 않음 - 반환값을 제자리 수정하지 말 것)
+@st.cache_resource
 def load_products(csv_path: str = "products.csv") -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+    # 헤더만 먼저 읽어 필요한 열을 찾은 뒤, 그 열만 본문에서 읽음
+    header = pd.read_csv(csv_path, nrows=0).columns
     # 표준화된 컬럼 이름 확인/정리
     rename_map = {}
-    for col in df.columns:
+    for col in header:
         col_strip = str(col).strip()
         if col_strip in ["품명", "상품명", "이름", "name", "title"]:
             rename_map[col] = "품명"
@@ -132,37 +200,135 @@ def load_products(csv_path: str = "products.csv") -> pd.DataFrame:
             rename_map[col] = "가격"
         elif col_strip.lower() in ["이미지url", "이미지", "image", "image_url", "img"]:
             rename_map[col] = "이미지url"
+    # 문자열 열은 dtype을 지정해 타입 추론을 건너뜀 (가격은 숫자일 때 빠른 경로를 타도록 추론 유지)
+    text_dtypes = {col: "string" for col, std in rename_map.items() if std != "가격"}
+    df = _read_csv_fast(csv_path, usecols=list(rename_map) or None, dtype=text_dtypes or None)
     df = df.rename(columns=rename_map)
     for needed in ["품명", "가격", "이미지url"]:
         if needed not in df.columns:
             raise ValueError("products.csv에는 '품명, 가격, 이미지url' 열이 반드시 있어야 합니다.")
-    df["가격"] = df["가격"].apply(_parse_price)
-    return df[["품명", "가격", "이미지url"]]
+    df["가격"] = _parse_prices(df["가격"])
+    # 카탈로그는 고정이므로 표시용 가격 문자열을 한 번만 만들어 둠
+    df["가격_표시"] = df["가격"].map(_format_won_int)
+    df = df[["품명", "가격", "이미지url", "가격_표시"]]
+    return df.astype({"품명": _string_dtype(), "이미지url": _string_dtype(), "가격": "int32"})
+
+# 썸네일 리샘플링 필터: Pillow 9.1+는 Image.Resampling, 이전 버전은 Image 상수 (한 번만 결정)
+# 120px 썸네일에서는 Lanczos와 눈으로 구분되지 않으므로 더 가벼운 BILINEAR 사용
+try:
+    _THUMB_RESAMPLE = Image.Resampling.BILINEAR
+except AttributeError:
+    _THUMB_RESAMPLE = Image.BILINEAR
+
+# 축소된 썸네일의 디스크 캐시 (프로세스 재시작/세션 간 재다운로드 방지)
+_IMAGE_CACHE_DIR = Path(__file__).parent.resolve() / ".cache" / "images"
+_IMAGE_CACHE_TTL = 7 * 24 * 3600   # 초 단위, 지나면 원본 이미지를 다시 받음
+
+def _image_cache_path(url: str, size) -> Path:
+    key = hashlib.sha1(str(url).encode("utf-8")).hexdigest()
+    return _IMAGE_CACHE_DIR / f"{key}_{size[0]}x{size[1]}.webp"
+
+def _save_image_cache(img: Image.Image, path: Path):
+    """
+    임시 파일에 쓴 뒤 교체 (동시 다운로드 스레드끼리 반쯤 쓰인 파일을 읽지 않도록)
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(tmp, format="WEBP", lossless=True)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def _placeholder(size) -> Image.Image:
+    """
+    '이미지 없음' 대체 이미지 (크기별로 한 번만 그림, 사용하는 쪽에서 copy())
+    """
+    img = Image.new("RGBA", size, (230, 230, 230, 255))
+    d = ImageDraw.Draw(img)
+    d.text((10, size[1]//2 - 8), "이미지\n없음", fill=(100, 100, 100))
+    return img
+
+def _is_timeout(e: Exception) -> bool:
+    """
+    시간 초과 여부. 재시도 한도에 걸린 시간 초과는 requests가 ConnectionError(MaxRetryError)로 감싸고,
+    본문 읽기 중 시간 초과는 ConnectionError(ReadTimeoutError)로 오므로 원인까지 확인
+    """
+    if isinstance(e, requests.exceptions.Timeout):
+        return True
+    if isinstance(e, requests.exceptions.ConnectionError) and e.args:
+        cause = getattr(e.args[0], "reason", e.args[0])   # MaxRetryError -> 원래 예외
+        return isinstance(cause, HTTPTimeoutError)
+    return False
 
 @st.cache_data(show_spinner=False)
 def fetch_image(url: str, size=(120, 120)) -> Image.Image:
     """
     결과 PNG 생성용으로만 사용 (상품/카트 표시에는 HTML <img> 사용)
     """
+    # 빈 값/NaN/http(s)가 아닌 주소는 네트워크 요청 없이 바로 대체 이미지
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        return _placeholder(size).copy()
+    cache_path = _image_cache_path(url, size)
     try:
-        r = requests.get(url, timeout=7)
+        fresh = time.time() - cache_path.stat().st_mtime < _IMAGE_CACHE_TTL
+    except OSError:
+        fresh = False
+    if fresh:
+        try:
+            with Image.open(cache_path) as cached:
+                return cached.convert("RGBA")
+        except Exception:
+            pass
+    try:
+        r = _http_session().get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         r.raise_for_status()
-        img = Image.open(io.BytesIO(r.content)).convert("RGBA")
-    except Exception:
-        img = Image.new("RGBA", size, (230, 230, 230, 255))
-        d = ImageDraw.Draw(img)
-        d.text((10, size[1]//2 - 8), "이미지\n없음", fill=(100, 100, 100))
-        return img
-    img.thumbnail(size, Image.LANCZOS)
+        img = Image.open(io.BytesIO(r.content))
+        # JPEG는 디코딩 단계에서 1/2~1/8로 축소 (리샘플링 품질을 위해 목표의 2배 이상 유지)
+        # thumbnail()도 draft를 쓰지만 아래 모드 변환이 먼저 전체 해상도로 로드해 버리므로 여기서 지정
+        img.draft("RGB", (size[0] * 2, size[1] * 2))
+        # 원본 해상도에서의 RGBA 변환(전체 복사)을 피하고, 축소 후 작은 이미지만 변환
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        img.thumbnail(size, _THUMB_RESAMPLE)
+        img = img.convert("RGBA")
+    except Exception as e:
+        if _is_timeout(e):
+            _log.warning("이미지 다운로드 시간 초과, 대체 이미지 사용: %s", url)
+        return _placeholder(size).copy()
     canvas = Image.new("RGBA", size, (255, 255, 255, 0))
     canvas.paste(img, ((size[0]-img.width)//2, (size[1]-img.height)//2))
+    _save_image_cache(canvas, cache_path)
     return canvas
 
+def fetch_images(urls, size=(120, 120)) -> list:
+    """
+    여러 이미지를 스레드 풀로 동시에 다운로드 (입력 순서 유지)
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, len(urls))) as ex:
+        return list(ex.map(lambda u: fetch_image(u, size=size), urls))
+
+@st.cache_resource(show_spinner=False)
+def _prefetch_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=_FETCH_WORKERS, thread_name_prefix="img-prefetch")
+
+def prefetch_images(urls, size=(120, 120)):
+    """
+    기다리지 않고 백그라운드에서 썸네일을 받아 캐시만 채움 (결과 화면에서 바로 사용)
+    """
+    pool = _prefetch_pool()
+    for u in dict.fromkeys(urls):
+        pool.submit(fetch_image, u, size)
+
 # --------- 폰트 탐색 & 로딩 강화 ----------
-@st.cache_data(show_spinner=False)
+@st.cache_resource(show_spinner=False)
 def find_korean_font_path() -> str | None:
     """
-    NanumHumanRegular.ttf을 우선적으로 탐색.
+    NanumHumanRegular.ttf을 우선적으로 탐색 (프로세스당 한 번만 탐색, 이후엔 같은 결과 재사용).
     - st.secrets['KOREAN_FONT_PATH']
     - 현재 작업 디렉토리, 스크립트 디렉토리, ./fonts, 프로젝트 루트 하위 rglob
     - 일반 한글 폰트 후보도 보조 탐색
@@ -218,19 +384,28 @@ def find_korean_font_path() -> str | None:
 
     return None
 
-def get_font(prefer_size=32) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+# 결과 PNG에서 쓰는 글꼴 크기 (제목/굵게/본문/작게)
+_RESULT_FONT_SIZES = (44, 28, 24, 22)
+
+@st.cache_resource(show_spinner=False)
+def _load_font(path: str | None, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     """
-    한글 폰트: 리포지토리/시스템에서 경로를 찾아 로드. 실패 시 기본 폰트(한글 미지원 가능).
+    (경로, 크기)별로 한 번만 TTF를 파싱하고 같은 폰트 객체를 재사용 (스크립트 재실행에도 유지)
     """
-    fp = find_korean_font_path()
-    if fp:
+    if path:
         try:
-            return ImageFont.truetype(fp, prefer_size)
+            return ImageFont.truetype(path, size)
         except Exception:
             pass
     # 마지막 폴백(한글 깨질 수 있음)
     return ImageFont.load_default()
 
+def get_font(prefer_size=32) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """
+    한글 폰트: 리포지토리/시스템에서 경로를 찾아 로드. 실패 시 기본 폰트(한글 미지원 가능).
+    """
+    return _load_font(find_korean_font_path(), prefer_size)
+
 def font_status() -> str:
     fp = find_korean_font_path()
     return fp if fp else "(찾지 못함) 기본 폰트 사용 중 - PNG의 한글이 깨질 수 있어요."
@@ -245,10 +420,32 @@ def _text_wh(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont):
     except Exception:
         return draw.textsize(text, font=font)
 
-def make_result_image(mission_title: str, reasons: str, items: pd.DataFrame, total: int, budget: int) -> bytes:
+# 결과 이미지 저장 형식: 형식 -> (확장자, MIME)
+RESULT_IMAGE_FORMATS = {"PNG": ("png", "image/png"), "WEBP": ("webp", "image/webp")}
+# WebP가 인코딩할 수 있는 최대 가로/세로(px) - 넘으면 PNG로 저장
+_WEBP_MAX_SIDE = 16383
+# 결과 이미지에 그리는 구매 이유 최대 줄 수
+_REASON_MAX_LINES = 20
+
+def _flatten_on_white(thumbs: list) -> list:
+    """
+    같은 크기의 RGBA 썸네일들을 NumPy로 한 번에 흰 배경과 합성해 RGB 이미지 목록으로 반환
+    (캔버스에서는 알파 합성 없이 단순 복사로 붙일 수 있음)
+    """
+    if not thumbs:
+        return []
+    rgba = np.stack([np.asarray(t.convert("RGBA") if t.mode != "RGBA" else t) for t in thumbs]).astype(np.uint16)
+    alpha = rgba[..., 3:]
+    rgb = (rgba[..., :3] * alpha + 255 * (255 - alpha) + 127) // 255
+    return [Image.fromarray(a) for a in rgb.astype(np.uint8)]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def make_result_image(mission_title: str, reasons: str, items: tuple, total: int, budget: int,
+                      fmt: str = "PNG") -> tuple[bytes, str]:
     """
-    결과 이미지를 PIL로 생성하여 PNG 바이트로 반환.
-    items: 컬럼 ['이미지', '품명', '수량', '단가', '합계']
+    결과 이미지를 PIL로 생성하여 (PNG 또는 WebP 바이트, 실제 저장 형식)으로 반환.
+    WebP 한도(_WEBP_MAX_SIDE)보다 긴 이미지는 WebP를 요청해도 PNG로 저장.
+    items: (품명, 수량, 단가, 합계, 이미지url) 행 튜플들의 튜플 (해시 가능 → 같은 입력이면 캐시된 결과 반환)
     """
     # 레이아웃 설정
     padding = 40
@@ -258,74 +455,78 @@ def make_result_image(mission_title: str, reasons: str, items: pd.DataFrame, tot
     row_h = max(thumb_size[1] + 20, line_h * 3)
     table_w = 980
     footer_h = 160
-    reason_lines = [s for s in reasons.strip().split("\n")] if reasons.strip() else []
+    reason_lines = reasons.strip().split("\n")[:_REASON_MAX_LINES] if reasons.strip() else []
     reason_h = max(100, 26 * max(1, len(reason_lines)))
 
     # 전체 높이 계산
     h = header_h + 30 + len(items) * row_h + 40 + reason_h + 30 + footer_h + padding * 2
     w = table_w + padding * 2
 
+    # RGB 캔버스: 썸네일은 아래에서 흰 배경과 미리 합성해 붙이므로 저장 전 전체 변환이 필요 없음
     img = Image.new("RGB", (w, h), (255, 255, 255))
     d = ImageDraw.Draw(img)
+    # 자주 호출하는 메서드는 지역 변수로 묶고 (xy, text, fill, font) 순서의 위치 인자로 호출
+    draw_text = d.text
 
     # ---- 폰트(한글 지원) 로딩
-    title_font = get_font(44)
-    bold_font = get_font(28)
-    text_font = get_font(24)
-    small_font = get_font(22)
+    title_font, bold_font, text_font, small_font = (get_font(sz) for sz in _RESULT_FONT_SIZES)
 
     # 헤더 (상단 중앙 정렬)
     title_text = f"미션: {mission_title}"
     tw, th = _text_wh(d, title_text, title_font)
-    d.text(((w - tw) // 2, padding), title_text, font=title_font, fill=(20, 20, 20))
+    draw_text(((w - tw) // 2, padding), title_text, (20, 20, 20), title_font)
 
     y = padding + header_h
 
     # 테이블 헤더
     d.rectangle([(padding-10, y-12), (w-padding+10, y+40)], outline=(220, 220, 220), width=1)
-    d.text((padding, y), "구매 품목", font=bold_font, fill=(30, 30, 30))
+    draw_text((padding, y), "구매 품목", (30, 30, 30), bold_font)
     y += 60
 
     # 각 아이템 행 (이미지/이름/수량/단가/합계)
-    for _, row in items.iterrows():
+    # 행마다 바뀌지 않는 좌표는 루프 밖에서 한 번만 계산
+    x_text = padding + thumb_size[0] + 20
+    name_dy, detail_dy, sum_dy = 4, 4 + line_h, 4 + line_h * 2
+    # 행 튜플을 그대로 풀어서 순회 (DataFrame/Series를 만들지 않음)
+    thumbs = _flatten_on_white(fetch_images([url for *_, url in items], size=thumb_size))
+    for (name, qty, price, subtotal, _url), thumb in zip(items, thumbs):
         d.rectangle([(padding-10, y-10), (w-padding+10, y+row_h-10)], outline=(235, 235, 235), width=1)
-        try:
-            thumb = row["이미지"]
-            if not isinstance(thumb, Image.Image):
-                thumb = fetch_image(row["이미지url"], size=thumb_size)
-        except Exception:
-            thumb = fetch_image("", size=thumb_size)
-        img.paste(thumb.convert("RGBA"), (padding, y), mask=thumb)
+        img.paste(thumb, (padding, y))
 
-        x_text = padding + thumb_size[0] + 20
-        d.text((x_text, y + 4), f"{row['품명']}", font=bold_font, fill=(20, 20, 20))
-        d.text((x_text, y + 4 + line_h), f"수량: {row['수량']}   단가: {format_won(row['단가'])}", font=text_font, fill=(60, 60, 60))
-        d.text((x_text, y + 4 + line_h*2), f"합계: {format_won(row['합계'])}", font=text_font, fill=(0, 0, 0))
+        draw_text((x_text, y + name_dy), f"{name}", (20, 20, 20), bold_font)
+        draw_text((x_text, y + detail_dy), f"수량: {qty}   단가: {_format_won_int(price)}", (60, 60, 60), text_font)
+        draw_text((x_text, y + sum_dy), f"합계: {_format_won_int(subtotal)}", (0, 0, 0), text_font)
 
         y += row_h
 
     # 구매 이유
     y += 10
-    d.text((padding, y), "구매 이유", font=bold_font, fill=(30, 30, 30))
+    draw_text((padding, y), "구매 이유", (30, 30, 30), bold_font)
     y += 42
     box_top = y - 12
     d.rectangle([(padding-10, box_top), (w-padding+10, y + reason_h)], outline=(220, 220, 220), width=1)
-    for i, line in enumerate(reason_lines[:20]):
-        d.text((padding, y + i * 26), line, font=small_font, fill=(40, 40, 40))
+    # 여러 줄을 한 번의 multiline_text 호출로 그림 (줄 간격 26px: spacing = 26 - 글꼴의 "A" 높이)
+    reason_spacing = 26 - small_font.getbbox("A")[3]
+    d.multiline_text((padding, y), "\n".join(reason_lines), (40, 40, 40), small_font, spacing=reason_spacing)
     y += reason_h + 36
 
     # 합계/예산/차액
     spent = total
     remain = budget - total
-    d.text((padding, y), f"주어진 금액: {format_won(budget)}", font=bold_font, fill=(20, 20, 20))
-    d.text((padding + 360, y), f"총 사용 금액: {format_won(spent)}", font=bold_font, fill=(20, 20, 20))
-    d.text((padding + 720, y), f"잔액: {format_won(remain)}", font=bold_font, fill=(0, 120, 0) if remain >= 0 else (180, 0, 0))
+    draw_text((padding, y), f"주어진 금액: {format_won(budget)}", (20, 20, 20), bold_font)
+    draw_text((padding + 360, y), f"총 사용 금액: {format_won(spent)}", (20, 20, 20), bold_font)
+    draw_text((padding + 720, y), f"잔액: {format_won(remain)}", (0, 120, 0) if remain >= 0 else (180, 0, 0), bold_font)
 
-    # PNG로 저장
+    # 저장 (일회성 다운로드라 압축률보다 인코딩 속도 우선)
     buf = io.BytesIO()
-    img.save(buf, format="PNG")
+    if fmt == "WEBP" and max(w, h) > _WEBP_MAX_SIDE:
+        fmt = "PNG"
+    if fmt == "WEBP":
+        img.save(buf, format="WEBP", quality=88, method=0)
+    else:
+        img.save(buf, format="PNG", compress_level=1, optimize=False)
     buf.seek(0)
-    return buf.read()
+    return buf.read(), fmt
 
 def init_state():
     if "step" not in st.session_state:
@@ -336,10 +537,14 @@ def init_state():
         st.session_state.budget = 0
     if "cart" not in st.session_state:
         st.session_state.cart: Dict[str, Dict[str, Any]] = {}
+    if "cart_version" not in st.session_state:
+        st.session_state.cart_version = 0   # 장바구니가 바뀔 때마다 증가
     if "submitted" not in st.session_state:
         st.session_state.submitted = False
     if "reasons" not in st.session_state:
         st.session_state.reasons = ""
+    if "visible_count" not in st.session_state:
+        st.session_state.visible_count = _CATALOG_PAGE_SIZE   # 카드 그리드에 보이는 상품 수
 
 def add_to_cart(name: str, price: int, img_url: str, qty: int):
     if qty <= 0:
@@ -349,12 +554,33 @@ def add_to_cart(name: str, price: int, img_url: str, qty: int):
         cart[name]["qty"] += qty
     else:
         cart[name] = {"price": price, "img_url": img_url, "qty": qty}
+    st.session_state.cart_version += 1
+
+def _cart_arrays():
+    """
+    장바구니의 단가/수량 배열 (dict가 원본, 배열은 버전이 바뀔 때만 다시 만듦)
+    """
+    ss = st.session_state
+    if ss.get("cart_arrays_version") != ss.cart_version:
+        items = list(ss.cart.values())
+        ss.cart_prices = np.fromiter((v["price"] for v in items), dtype=np.int64, count=len(items))
+        ss.cart_qtys = np.fromiter((v["qty"] for v in items), dtype=np.int64, count=len(items))
+        ss.cart_arrays_version = ss.cart_version
+    return ss.cart_prices, ss.cart_qtys
 
 def cart_total() -> int:
-    return int(sum(v["price"] * v["qty"] for v in st.session_state.cart.values()))
+    prices, qtys = _cart_arrays()
+    return int(prices @ qtys)
 
 def clear_cart():
     st.session_state.cart = {}
+    st.session_state.cart_version += 1
+
+def _cart_key(cart: Dict[str, Dict[str, Any]]) -> tuple:
+    """
+    장바구니 내용을 품명 순으로 정렬한 해시 가능한 튜플 (캐시 키용)
+    """
+    return tuple(sorted((k, v["qty"], v["price"], v["img_url"]) for k, v in cart.items()))
 
 # -----------------------------
 # 미션 정의 (+ 이모지 추가)
@@ -385,51 +611,57 @@ def start_page():
             if st.button(f"'{m}' 미션 선택", key=f"select_{i}"):
                 st.session_state.mission = m
                 st.session_state.budget = budget
-                st.session_state.cart = {}
+                clear_cart()
                 st.session_state.submitted = False
                 st.session_state.reasons = ""
                 st.session_state.step = "shop"
 
     st.info("예: 카레 만들기, 여름캠핑, 생일파티 등 다양한 상황에서 필요한 물건을 골라 보세요!")
 
-def _product_cards_html(df_slice: pd.DataFrame) -> str:
-    cards = ['<div class="product-grid">']
-    for _, row in df_slice.iterrows():
-        name = str(row["품명"])
-        price = int(row["가격"])
-        img = str(row["이미지url"])
-        cards.append(f"""
+# 쿼리 파라미터로 리사이즈를 지원하는 이미지 호스트: 호스트 -> 함께 붙일 파라미터
+_RESIZABLE_IMAGE_HOSTS = {
+    "images.unsplash.com": {"q": "70", "auto": "format", "fit": "crop"},
+    "img.freepik.com": {},
+}
+
+def _thumb_url(url: str, w: int = 320) -> str:
+    """
+    화면 표시용 <img> 주소: 지원하는 호스트면 표시 크기(w px)로 줄인 이미지를 요청
+    (PNG 생성에는 원래 주소를 그대로 사용)
+    """
+    if not isinstance(url, str):
+        return url
+    parts = urlsplit(url)
+    extra = _RESIZABLE_IMAGE_HOSTS.get(parts.netloc)
+    if extra is None:
+        return url
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update(extra)
+    query["w"] = str(w)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+# 상품 카드 / 장바구니 행 HTML 템플릿 (모듈 로드 시 한 번만 정의)
+_CARD_TMPL = """
         <div class="product-card">
           <div class="product-title">{name}</div>
           <div class="product-img-wrap">
-            <img src="{img}" alt="{name}" loading="lazy" />
+            <img src="{img}"{srcset} alt="{name}" loading="lazy" />
           </div>
-          <div class="product-price">{format_won(price)}</div>
+          <div class="product-price">{price}</div>
         </div>
-        """)
-    cards.append("</div>")
-    return "\n".join(cards)
+        """
 
-def _render_product_cards(df_slice: pd.DataFrame):
-    render_html(_product_cards_html(df_slice))
-
-def _render_cart_table_html(cart: Dict[str, Dict[str, Any]]):
-    rows = []
-    for name, v in cart.items():
-        qty = int(v["qty"])
-        price = int(v["price"])
-        total = qty * price
-        img = v["img_url"]
-        rows.append(f"""
+_CART_ROW_TMPL = """
         <tr>
           <td><img class="cart-thumb" src="{img}" alt="{name}" loading="lazy" /></td>
           <td>{name}</td>
           <td>{qty}</td>
-          <td>{format_won(price)}</td>
-          <td>{format_won(total)}</td>
+          <td>{price}</td>
+          <td>{total}</td>
         </tr>
-        """)
-    html = f"""
+        """
+
+_CART_TABLE_TMPL = """
     <table class="cart-table">
       <thead>
         <tr>
@@ -437,39 +669,97 @@ def _render_cart_table_html(cart: Dict[str, Dict[str, Any]]):
         </tr>
       </thead>
       <tbody>
-        {''.join(rows)}
+        {rows}
       </tbody>
     </table>
     """
-    render_html(html)
 
-def shop_page(df: pd.DataFrame):
-    st.title(f"🛍️ 쇼핑 - 미션: {st.session_state.mission}")
-    st.caption(f"예산: {format_won(st.session_state.budget)}")
+# 카드 그리드에 한 번에 보여 줄 상품 수 ('더 보기'를 누를 때마다 이만큼 늘어남)
+_CATALOG_PAGE_SIZE = 12
+# 카드 이미지 후보 폭(px) / 표시 폭 힌트: 그리드는 항상 3열이고 이미지는 높이 170px 박스에 contain으로
+# 들어가므로 표시 폭은 좁은 화면에선 카드 폭(약 30vw), 그 외에는 약 170px.
+# 후보는 기본 src(360px)를 넘지 않게 두어 어떤 화면에서도 전보다 큰 이미지를 받지 않음
+_CARD_SRCSET_WIDTHS = (120, 240, 360)
+_CARD_IMG_SIZES = "(max-width: 560px) 30vw, 170px"
 
-    # 3열 그리드: 행 단위로 처리
-    n_cols = 3
-    rows = math.ceil(len(df) / n_cols)
+def _card_srcset(url: str) -> str:
+    """
+    리사이즈를 지원하는 호스트면 srcset/sizes 속성 문자열(화면 폭에 맞는 크기만 받도록), 아니면 빈 문자열
+    """
+    if not isinstance(url, str) or urlsplit(url).netloc not in _RESIZABLE_IMAGE_HOSTS:
+        return ""
+    candidates = ", ".join(f"{_thumb_url(url, w)} {w}w" for w in _CARD_SRCSET_WIDTHS)
+    return f' srcset="{candidates}" sizes="{_CARD_IMG_SIZES}"'
 
-    for r in range(rows):
-        start = r * n_cols
-        end = min((r + 1) * n_cols, len(df))
-        df_slice = df.iloc[start:end]
+def _product_cards_html(df_slice: pd.DataFrame) -> str:
+    cards = ['<div class="product-grid">']
+    cards.extend(
+        _CARD_TMPL.format(name=name, img=_thumb_url(img, 360), srcset=_card_srcset(img), price=price)
+        for name, img, price in zip(df_slice["품명"].tolist(), df_slice["이미지url"].tolist(),
+                                    df_slice["가격_표시"].tolist())
+    )
+    cards.append("</div>")
+    return "\n".join(cards)
 
-        # HTML 카드 묶음 출력 (고정 높이 & HTML 이미지)
-        _render_product_cards(df_slice)
+@st.cache_data(show_spinner=False)
+def _catalog_cards_html(csv_path: str, count: int) -> str:
+    """
+    카탈로그 앞쪽 count개 카드 HTML. 카탈로그는 세션 동안 바뀌지 않으므로 (CSV 경로, 개수)별로 한 번만 생성
+    (DataFrame 내용 해시보다 경로 문자열 키가 훨씬 저렴)
+    """
+    return _product_cards_html(load_products(csv_path).iloc[:count])
 
-        # 같은 순서로 각 카드 아래에 수량/담기 버튼 배치(3열)
-        cols = st.columns(len(df_slice))
-        for c, (_, row) in enumerate(df_slice.iterrows()):
-            with cols[c]:
-                qty = st.number_input("수량", min_value=0, max_value=99, value=0, step=1, key=f"qty_{start+c}")
-                if st.button("장바구니 담기", key=f"add_{start+c}"):
-                    add_to_cart(str(row["품명"]), int(row["가격"]), str(row["이미지url"]), int(qty))
-                    st.toast(f"'{row['품명']}' {qty}개를 담았습니다.", icon="🧺")
+def _render_cart_table_html(cart: Dict[str, Dict[str, Any]]):
+    rows = []
+    for name, v in cart.items():
+        qty = int(v["qty"])
+        price = int(v["price"])
+        rows.append(_CART_ROW_TMPL.format(
+            img=_thumb_url(v["img_url"], 120), name=name, qty=qty,
+            price=_format_won_int(price), total=_format_won_int(qty * price),
+        ))
+    render_html(_CART_TABLE_TMPL.format(rows="".join(rows)))
 
-    st.divider()
+def _render_qty_editor(df: pd.DataFrame):
+    """
+    전체 상품의 수량을 st.data_editor 하나로 입력받고, 버튼 한 번으로 장바구니에 일괄 반영
+    (form: 수량을 여러 개 고쳐도 재실행 없이 모았다가 '장바구니 담기' 때 한 번만 반영,
+     담기 후에는 입력한 수량을 0으로 비우고(다시 담기 방지) 장바구니 갱신을 위해 전체 재실행)
+    """
+    view = df[["품명", "가격_표시"]].assign(수량=0)
+    with st.form("catalog_form", clear_on_submit=True):
+        edited = st.data_editor(
+            view,
+            key="catalog_editor",
+            disabled=["품명", "가격_표시"],
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "가격_표시": st.column_config.TextColumn("가격"),
+                "수량": st.column_config.NumberColumn("수량", min_value=0, max_value=99, step=1),
+            },
+        )
+        submitted = st.form_submit_button("장바구니 담기", type="primary")
+    if submitted:
+        qtys = edited["수량"].fillna(0).astype(int).to_numpy()
+        picked = np.flatnonzero(qtys > 0)
+        if len(picked) == 0:
+            st.toast("담을 수량을 입력해 주세요.", icon="ℹ️")
+            return
+        names = df["품명"].tolist()
+        prices = df["가격"].tolist()
+        urls = df["이미지url"].tolist()
+        for i in picked:
+            add_to_cart(str(names[i]), int(prices[i]), str(urls[i]), int(qtys[i]))
+        # 결과 PNG에 들어갈 썸네일을 미리 받아 둠
+        prefetch_images(str(urls[i]) for i in picked)
+        # 전체 재실행 후에 알림을 띄우도록 보관
+        st.session_state.pending_toast = f"{len(picked)}개 품목을 담았습니다."
+        # 서버 쪽 편집 상태도 지워서 다음 '담기'에 이전 수량이 다시 더해지지 않게 함
+        st.session_state.pop("catalog_editor", None)
+        st.rerun()
 
+def _render_cart_section():
     # 장바구니 요약 (이미지 포함 HTML 테이블)
     st.subheader("🧺 장바구니")
     cart = st.session_state.cart
@@ -503,6 +793,33 @@ def shop_page(df: pd.DataFrame):
         st.session_state.step = "result"
         st.rerun()
 
+def shop_page(df: pd.DataFrame, csv_path: str):
+    """
+    df: load_products(csv_path)로 읽은 카탈로그 (카드 HTML 캐시는 같은 csv_path로 찾음)
+    """
+    st.title(f"🛍️ 쇼핑 - 미션: {st.session_state.mission}")
+    st.caption(f"예산: {format_won(st.session_state.budget)}")
+
+    pending = st.session_state.pop("pending_toast", None)
+    if pending:
+        st.toast(pending, icon="🧺")
+
+    # 상품 카드 그리드 (고정 높이 & HTML 이미지) - 위젯이 섞이지 않으므로 한 번에 출력
+    # 앞쪽 visible_count개만 그려서 재실행마다 보내는 HTML 크기를 줄임
+    visible = min(st.session_state.visible_count, len(df))
+    render_html(_catalog_cards_html(csv_path, visible))
+    if visible < len(df):
+        if st.button(f"더 보기 ({visible}/{len(df)})"):
+            st.session_state.visible_count = visible + _CATALOG_PAGE_SIZE
+            st.rerun()
+
+    # 수량 입력: 상품마다 number_input/button을 두지 않고 표 하나로 받음
+    st.subheader("📝 수량 입력")
+    _render_qty_editor(df)
+
+    st.divider()
+    _render_cart_section()
+
 def result_page():
     st.title(f"✅ 결과 - 미션: {st.session_state.mission}")
 
@@ -521,20 +838,10 @@ def result_page():
             st.rerun()
         return
 
-    df_items = pd.DataFrame(
-        [
-            {"품명": k, "수량": v["qty"], "단가": v["price"], "합계": v["price"] * v["qty"], "이미지url": v["img_url"]}
-            for k, v in cart.items()
-        ]
-    ).sort_values("품명")
-
-    # PNG 품질 안정: 사전 이미지 로드
-    df_items["이미지"] = df_items["이미지url"].apply(lambda u: fetch_image(u, size=(120, 120)))
-
     st.subheader("🧾 구매한 물건")
     _render_cart_table_html(cart)
 
-    total = int(df_items["합계"].sum())
+    total = cart_total()
     remain = st.session_state.budget - total
 
     col1, col2, col3 = st.columns(3)
@@ -554,40 +861,52 @@ def result_page():
         height=140
     )
 
-    # 구매 이유가 작성되면 PNG로 다운 버튼 노출
+    # 구매 이유가 작성되면 이미지 다운 버튼 노출
     if st.session_state.reasons.strip():
-        if st.button("🖼️ PNG로 다운"):
-            png_bytes = make_result_image(
+        fmt = "WEBP" if st.checkbox("WebP로 저장 (파일이 더 작고 생성이 빨라요)") else "PNG"
+        if st.button("🖼️ 이미지로 다운"):
+            # 이미지용 행 튜플 (품명 순). 썸네일은 make_result_image 안에서 받음
+            # (장바구니에 담을 때 prefetch_images로 미리 받아 두므로 대부분 캐시 적중)
+            items = tuple((k, q, p, p * q, u) for k, q, p, u in _cart_key(cart))
+            image_bytes, saved_fmt = make_result_image(
                 mission_title=st.session_state.mission,
                 reasons=st.session_state.reasons,
-                items=df_items,
+                items=items,
                 total=total,
-                budget=st.session_state.budget
+                budget=st.session_state.budget,
+                fmt=fmt
             )
+            if saved_fmt != fmt:
+                st.info("이미지가 너무 길어서 WebP 대신 PNG로 저장했어요.")
+            ext, mime = RESULT_IMAGE_FORMATS[saved_fmt]
             st.download_button(
-                "이미지 다운로드 (PNG)",
-                data=png_bytes,
-                file_name=f"{st.session_state.mission}_결과.png",
-                mime="image/png",
+                f"이미지 다운로드 ({saved_fmt})",
+                data=image_bytes,
+                file_name=f"{st.session_state.mission}_결과.{ext}",
+                mime=mime,
                 type="primary"
             )
             st.success("이미지를 생성했어요! 상단의 다운로드 버튼을 눌러 저장하세요.")
     else:
-        st.info("구매 이유를 작성하면 ‘PNG로 다운’ 버튼이 나타납니다.")
+        st.info("구매 이유를 작성하면 ‘이미지로 다운’ 버튼이 나타납니다.")
 
     st.divider()
     if st.button("처음으로 돌아가기"):
         st.session_state.step = "start"
-        st.session_state.cart = {}
+        clear_cart()
         st.session_state.submitted = False
         st.rerun()
 
 def main():
     init_state()
+    # 첫 PNG 다운로드가 폰트 로딩을 기다리지 않도록 미리 준비
+    for size in _RESULT_FONT_SIZES:
+        get_font(size)
+    csv_path = "products.csv"
     try:
-        products = load_products("products.csv")
+        products = load_products(csv_path)
     except Exception as e:
-        st.error(f"products.csv를 불러오는 중 오류가 발생했어요: {e}")
+        st.error(f"{csv_path}를 불러오는 중 오류가 발생했어요: {e}")
         st.stop()
 
     # 단계별 화면 전환
@@ -598,7 +917,7 @@ def main():
             st.session_state.step = "start"
             start_page()
         else:
-            shop_page(products)
+            shop_page(products, csv_path)
     elif st.session_state.step == "result":
         result_page()
     else: